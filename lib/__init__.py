@@ -1,2 +1,10 @@
 # Make lib a package and expose common imports
-from .database_utils import get_connection, create_tables, DB_FILE
+from .database_utils import (
+    get_connection,
+    create_tables,
+    close_pool,
+    identity_clear,
+    read_transaction,
+    unit_of_work,
+    DB_FILE,
+)
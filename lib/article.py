@@ -1,16 +1,24 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, TYPE_CHECKING
+from typing import Iterable, List, Optional, TYPE_CHECKING
 
-from .database_utils import get_connection
+from .database_utils import get_connection, record_insert, tuple_cursor, unit_of_work
 
 if TYPE_CHECKING:
     from .author import Author
     from .magazine import Magazine
 
 
-@dataclass
+_SQL_FIND_BY_ID = "SELECT id, title, content, author_id, magazine_id FROM articles WHERE id = ?"
+_SQL_INSERT = "INSERT INTO articles(title, content, author_id, magazine_id) VALUES (?, ?, ?, ?)"
+_SQL_UPDATE = (
+    "UPDATE articles SET title = ?, content = ?, author_id = ?, magazine_id = ? WHERE id = ?"
+)
+_SQL_LAST_INSERT_ROWID = "SELECT last_insert_rowid()"
+
+
+@dataclass(slots=True)
 class Article:
     id: Optional[int]
     _title: str
@@ -47,8 +55,7 @@ class Article:
 
     @author.setter
     def author(self, value: "Author") -> None:
-        from .author import Author
-        if not isinstance(value, Author) or value is None:
+        if not isinstance(value, _Author):
             raise ValueError("Article.author must be an Author instance")
         self._author = value
 
@@ -59,8 +66,7 @@ class Article:
 
     @magazine.setter
     def magazine(self, value: "Magazine") -> None:
-        from .magazine import Magazine
-        if not isinstance(value, Magazine) or value is None:
+        if not isinstance(value, _Magazine):
             raise ValueError("Article.magazine must be a Magazine instance")
         self._magazine = value
 
@@ -69,46 +75,93 @@ class Article:
     def new_from_db(cls, row) -> "Article":
         if row is None:
             return None
-        if isinstance(row, (list, tuple)):
-            id_, title, content, author_id, magazine_id = row
-        else:
-            id_, title, content, author_id, magazine_id = (
-                row["id"], row["title"], row["content"], row["author_id"], row["magazine_id"],
-            )
+        # Tuples and ``sqlite3.Row`` both unpack positionally.
+        id_, title, content, author_id, magazine_id = row
         # Hydrate related objects using their identifiers.
-        from .author import Author
-        from .magazine import Magazine
-        author = Author.find_by_id(author_id)
-        magazine = Magazine.find_by_id(magazine_id)
-        return cls(title=title, content=content, author=author, magazine=magazine, id=id_)
+        author = _Author.find_by_id(author_id)
+        magazine = _Magazine.find_by_id(magazine_id)
+        return cls._from_db_fast(id_, title, content, author, magazine)
+
+    @classmethod
+    def _from_db_fast(
+        cls,
+        id_: int,
+        title: str,
+        content: Optional[str],
+        author: "Author",
+        magazine: "Magazine",
+    ) -> "Article":
+        # Build from trusted database values, skipping ``__init__`` validation.
+        obj = object.__new__(cls)
+        obj._title = title
+        obj._author = author
+        obj._magazine = magazine
+        obj.content = content
+        obj.id = id_
+        return obj
 
     @classmethod
     def find_by_id(cls, id_: int) -> Optional["Article"]:
         with get_connection() as conn:
-            row = conn.execute(
-                "SELECT id, title, content, author_id, magazine_id FROM articles WHERE id = ?",
-                (id_,),
-            ).fetchone()
+            row = tuple_cursor(conn).execute(_SQL_FIND_BY_ID, (id_,)).fetchone()
             return cls.new_from_db(row)
 
     def save(self) -> "Article":
         # Ensure related objects are saved and have identifiers.
-        if getattr(self.author, "id", None) is None:
-            self.author.save()
-        if getattr(self.magazine, "id", None) is None:
-            self.magazine.save()
+        # ``id`` is always set by the Author/Magazine constructors and loaders.
+        author, magazine = self._author, self._magazine
+        if author.id is None:
+            author.save()
+        if magazine.id is None:
+            magazine.save()
         with get_connection() as conn:
-            cur = conn.cursor()
             if self.id is None:
-                cur.execute(
-                    "INSERT INTO articles(title, content, author_id, magazine_id) VALUES (?, ?, ?, ?)",
-                    (self._title, self.content, self.author.id, self.magazine.id),
-                )
-                self.id = cur.lastrowid
+                self.id = conn.execute(
+                    _SQL_INSERT,
+                    (self._title, self.content, author.id, magazine.id),
+                ).lastrowid
+                record_insert(self)
             else:
-                cur.execute(
-                    "UPDATE articles SET title = ?, content = ?, author_id = ?, magazine_id = ? WHERE id = ?",
-                    (self._title, self.content, self.author.id, self.magazine.id, self.id),
+                conn.execute(
+                    _SQL_UPDATE,
+                    (self._title, self.content, author.id, magazine.id, self.id),
                 )
-            conn.commit()
         return self
+
+    @classmethod
+    def bulk_save(cls, articles: Iterable["Article"]) -> List["Article"]:
+        # Insert new articles and update saved ones with one ``executemany`` each,
+        # all in a single transaction. Unsaved authors and magazines are saved first.
+        articles = list(articles)
+        # An article listed twice is still inserted once, as with ``save()``.
+        new = list({id(a): a for a in articles if a.id is None}.values())
+        existing = [a for a in articles if a.id is not None]
+        with unit_of_work() as conn:
+            for a in articles:
+                if a._author.id is None:
+                    a._author.save()
+                if a._magazine.id is None:
+                    a._magazine.save()
+            if new:
+                conn.executemany(
+                    _SQL_INSERT,
+                    [(a._title, a.content, a._author.id, a._magazine.id) for a in new],
+                )
+                # Rowids from one statement are contiguous when there is a single
+                # writer, which the open transaction guarantees.
+                last_id = conn.execute(_SQL_LAST_INSERT_ROWID).fetchone()[0]
+                for offset, a in enumerate(new, start=last_id - len(new) + 1):
+                    a.id = offset
+                    record_insert(a)
+            if existing:
+                conn.executemany(
+                    _SQL_UPDATE,
+                    [(a._title, a.content, a._author.id, a._magazine.id, a.id) for a in existing],
+                )
+        return articles
+
+
+# Imported once after the class body, rather than inside the setters, so that
+# ``Article`` is already defined if author.py or magazine.py import this module.
+from .author import Author as _Author  # noqa: E402
+from .magazine import Magazine as _Magazine  # noqa: E402
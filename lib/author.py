@@ -1,16 +1,54 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional, Iterable, TYPE_CHECKING
+from typing import Dict, List, Optional, Iterable, Iterator, TYPE_CHECKING
 
-from .database_utils import get_connection
+from .database_utils import (
+    chunked,
+    fetch_batches,
+    get_connection,
+    identity_discard,
+    identity_get,
+    identity_put,
+    record_insert,
+    tuple_cursor,
+    unit_of_work,
+)
 
 if TYPE_CHECKING:
     from .article import Article
     from .magazine import Magazine
 
 
-@dataclass
+_SQL_FIND_BY_ID = "SELECT id, name FROM authors WHERE id = ?"
+_SQL_FIND_BY_IDS = "SELECT id, name FROM authors WHERE id IN ({placeholders})"
+_SQL_INSERT = "INSERT INTO authors(name) VALUES (?)"
+_SQL_UPDATE = "UPDATE authors SET name = ? WHERE id = ?"
+_SQL_ARTICLES = """
+    SELECT a.id, a.title, a.content, a.magazine_id, m.name, m.category
+    FROM articles a
+    JOIN magazines m ON m.id = a.magazine_id
+    WHERE a.author_id = ?
+    ORDER BY a.id
+"""
+# Semijoin: looks up magazine ids via idx_articles_author_id without sorting
+# joined rows for DISTINCT.
+_SQL_MAGAZINES = """
+    SELECT m.id, m.name, m.category
+    FROM magazines m
+    WHERE m.id IN (SELECT magazine_id FROM articles WHERE author_id = ?)
+    ORDER BY m.id
+"""
+_SQL_TOPIC_AREAS = """
+    SELECT DISTINCT m.category
+    FROM magazines m
+    JOIN articles a ON a.magazine_id = m.id
+    WHERE a.author_id = ? AND m.category IS NOT NULL
+    ORDER BY m.category
+"""
+
+
+@dataclass(slots=True)
 class Author:
     id: Optional[int]
     _name: str
@@ -33,65 +71,107 @@ class Author:
     # Accepts a tuple or ``sqlite3.Row``.
         if row is None:
             return None
-        if isinstance(row, (list, tuple)):
-            id_, name = row
-        else:
-            id_, name = row["id"], row["name"]
-        return cls(name=name, id=id_)
+        id_, name = row
+        # Reuse the instance already loaded for this id, if any.
+        obj = identity_get(cls, id_)
+        if obj is None:
+            obj = cls._from_db_fast(id_, name)
+            identity_put(cls, id_, obj)
+        return obj
+
+    @classmethod
+    def _from_db_fast(cls, id_: int, name: str) -> "Author":
+        obj = object.__new__(cls)
+        obj._name = name
+        obj.id = id_
+        return obj
 
     @classmethod
     def find_by_id(cls, id_: int) -> Optional["Author"]:
+        cached = identity_get(cls, id_)
+        if cached is not None:
+            return cached
         with get_connection() as conn:
-            row = conn.execute("SELECT id, name FROM authors WHERE id = ?", (id_,)).fetchone()
+            row = tuple_cursor(conn).execute(_SQL_FIND_BY_ID, (id_,)).fetchone()
             return cls.new_from_db(row)
 
+    @classmethod
+    def find_by_ids(cls, ids: Iterable[int]) -> Dict[int, "Author"]:
+        # Load many authors at once, keyed by id; missing ids are omitted.
+        found: Dict[int, Author] = {}
+        missing = []
+        for id_ in set(ids):
+            cached = identity_get(cls, id_)
+            if cached is not None:
+                found[id_] = cached
+            else:
+                missing.append(id_)
+        with get_connection() as conn:
+            for chunk in chunked(missing):
+                placeholders = ", ".join("?" * len(chunk))
+                rows = conn.execute(
+                    _SQL_FIND_BY_IDS.format(placeholders=placeholders),
+                    chunk,
+                ).fetchall()
+                for r in rows:
+                    found[r["id"]] = cls.new_from_db(r)
+        return found
+
     # Insert a new row or update the existing row.
     def save(self) -> "Author":
         with get_connection() as conn:
-            cur = conn.cursor()
             if self.id is None:
-                cur.execute("INSERT INTO authors(name) VALUES (?)", (self._name,))
-                self.id = cur.lastrowid
+                self.id = conn.execute(_SQL_INSERT, (self._name,)).lastrowid
+                record_insert(self)
             else:
-                cur.execute("UPDATE authors SET name = ? WHERE id = ?", (self._name, self.id))
-            conn.commit()
+                conn.execute(_SQL_UPDATE, (self._name, self.id))
+                identity_discard(type(self), self.id)
         return self
 
     # Relationship helpers.
     def articles(self) -> List["Article"]:
+        return list(self._iter_articles(stream=False))
+
+    def iter_articles(self) -> Iterator["Article"]:
+        # Stream articles in batches rather than materializing every row first;
+        # see ``fetch_batches`` for which connection the rows are read from.
+        return self._iter_articles(stream=True)
+
+    def _iter_articles(self, stream: bool) -> Iterator["Article"]:
         from .article import Article  # Local import to avoid a circular dependency.
+        from .magazine import Magazine
         if self.id is None:
-            return []
-        with get_connection() as conn:
-            rows = conn.execute(
-                "SELECT id, title, content, author_id, magazine_id FROM articles WHERE author_id = ?",
-                (self.id,),
-            ).fetchall()
-            return [Article.new_from_db(r) for r in rows]
+            return
+        # Magazine columns come back with each row, so no per-row queries are needed;
+        # a magazine is only built when the identity map does not already hold it.
+        for rows in fetch_batches(_SQL_ARTICLES, (self.id,), stream=stream):
+            for id_, title, content, magazine_id, name, category in rows:
+                magazine = identity_get(Magazine, magazine_id)
+                if magazine is None:
+                    magazine = Magazine._from_db_fast(magazine_id, name, category)
+                    identity_put(Magazine, magazine_id, magazine)
+                yield Article._from_db_fast(id_, title, content, self, magazine)
 
     def magazines(self) -> List["Magazine"]:
         from .magazine import Magazine  # Local import to avoid a circular dependency.
         if self.id is None:
             return []
         with get_connection() as conn:
-            rows = conn.execute(
-                """
-                SELECT DISTINCT m.id, m.name, m.category
-                FROM magazines m
-                JOIN articles a ON a.magazine_id = m.id
-                WHERE a.author_id = ?
-                """,
-                (self.id,),
-            ).fetchall()
+            rows = conn.execute(_SQL_MAGAZINES, (self.id,)).fetchall()
             return [Magazine.new_from_db(r) for r in rows]
 
     # Aggregate helpers.
     def add_article(self, magazine: "Magazine", title: str) -> "Article":
         from .article import Article
         article = Article(title=title, author=self, magazine=magazine)
-        return article.save()
+        # Saving may also insert self and magazine; commit them together.
+        with unit_of_work():
+            return article.save()
 
     def topic_areas(self) -> List[str]:
-        # Unique categories derived from ``magazines()``.
-        categories = {m.category for m in self.magazines() if getattr(m, "category", None)}
-        return sorted(categories)
+        # Unique, sorted categories of the magazines this author has written for.
+        if self.id is None:
+            return []
+        with get_connection() as conn:
+            rows = tuple_cursor(conn).execute(_SQL_TOPIC_AREAS, (self.id,)).fetchall()
+            return [r[0] for r in rows]
@@ -1,36 +1,318 @@
 """SQLite database utilities.
 
-Provides the database filename, a connection factory, and table creation with
-foreign key constraints.
+Provides the database filename, a thread-local pooled connection, an identity
+map of loaded rows, and table creation with foreign key constraints.
 """
 
 from __future__ import annotations
 
+import os
 import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
 
 # SQLite database filename. The file is created in the project root when first written.
-DB_FILE = "magazine.db"
+# Set ``MAGAZINE_DB_FILE`` to use another path or a ``file:`` URI such as
+# ``file::memory:?cache=shared``.
+DB_FILE = os.environ.get("MAGAZINE_DB_FILE", "magazine.db")
 
 
-def get_connection() -> sqlite3.Connection:
-	"""Open a new connection to ``DB_FILE``.
+# Upper bound on bound parameters per statement, kept below SQLite's default
+# ``SQLITE_MAX_VARIABLE_NUMBER`` of 999 on older builds.
+MAX_VARIABLES = 900
 
-	Foreign key enforcement in SQLite is disabled by default and must be
-	enabled per connection using ``PRAGMA foreign_keys = ON;``. This function
-	does not enable it; callers enable the pragma as required.
-	"""
-	conn = sqlite3.connect(DB_FILE)
+# Prepared statements kept per connection. The model modules keep their SQL in
+# module-level ``_SQL_*`` constants so the same strings hit this cache; the
+# default of 128 is raised so those queries are never evicted.
+STATEMENT_CACHE_SIZE = 256
+
+# Rows fetched per ``fetchmany`` call when streaming result sets.
+FETCH_SIZE = 256
+
+# Pragmas applied once to each pooled connection when it is opened.
+_PRAGMAS = (
+	"PRAGMA journal_mode = WAL;",
+	"PRAGMA synchronous = NORMAL;",
+	"PRAGMA cache_size = -20000;",
+	"PRAGMA foreign_keys = ON;",
+	"PRAGMA temp_store = MEMORY;",
+)
+
+# One long-lived connection per thread, opened lazily by ``get_connection``.
+_POOL = threading.local()
+
+
+def _open_connection() -> sqlite3.Connection:
+	"""Open a new connection to ``DB_FILE`` and apply ``_PRAGMAS``."""
+	conn = sqlite3.connect(
+		DB_FILE,
+		cached_statements=STATEMENT_CACHE_SIZE,
+		uri=DB_FILE.startswith("file:"),
+	)
 	# Access columns by name: row["column"]
 	conn.row_factory = sqlite3.Row
+	for pragma in _PRAGMAS:
+		conn.execute(pragma)
+	return conn
+
+
+def _pooled_connection() -> sqlite3.Connection:
+	"""Return the calling thread's pooled connection, opening it if needed."""
+	conn = getattr(_POOL, "conn", None)
+	if conn is None:
+		conn = _POOL.conn = _open_connection()
 	return conn
 
 
+def in_unit_of_work() -> bool:
+	"""Return whether the calling thread is inside ``unit_of_work``."""
+	return getattr(_POOL, "in_unit_of_work", False)
+
+
+@contextmanager
+def get_connection() -> Iterator[sqlite3.Connection]:
+	"""Yield the calling thread's pooled connection to ``DB_FILE``.
+
+	The connection is opened on first use and kept open between calls so the
+	SQLite page cache stays warm. Foreign key enforcement is enabled when the
+	connection is opened. Leaving the block commits the current transaction,
+	or rolls it back if an exception was raised; the connection is not closed.
+	Inside ``unit_of_work``, or when a transaction was already open on entry,
+	the owner of that transaction decides instead.
+	"""
+	conn = _pooled_connection()
+	if in_unit_of_work() or conn.in_transaction:
+		yield conn
+		return
+	try:
+		yield conn
+	except BaseException:
+		conn.rollback()
+		raise
+	else:
+		conn.commit()
+
+
+@contextmanager
+def unit_of_work() -> Iterator[sqlite3.Connection]:
+	"""Run the enclosed writes in a single transaction.
+
+	``save()`` calls made inside the block skip their own commit, so saving N
+	rows costs one commit instead of N. The transaction is committed when the
+	block exits and rolled back if it raises. On rollback, objects that were
+	given an ``id`` by an INSERT in the block (see ``record_insert``) have it
+	reset to ``None`` so they can be saved again, and the identity map is
+	cleared. Nested units join the outermost.
+
+	If the connection already has a transaction open that is not a unit (for
+	example pending writes inside ``get_connection``), the unit runs as a
+	SAVEPOINT within it: a failure undoes only the unit's own writes, and the
+	owner of the outer transaction still decides whether to commit.
+	"""
+	conn = _pooled_connection()
+	if in_unit_of_work():
+		yield conn
+		return
+	joined = conn.in_transaction
+	conn.execute("SAVEPOINT unit_of_work" if joined else "BEGIN")
+	_POOL.in_unit_of_work = True
+	_POOL.inserted = []
+	try:
+		yield conn
+	except BaseException:
+		if joined:
+			conn.execute("ROLLBACK TO unit_of_work")
+			conn.execute("RELEASE unit_of_work")
+		else:
+			conn.rollback()
+		for obj in _POOL.inserted:
+			obj.id = None
+		identity_clear()
+		raise
+	else:
+		if joined:
+			conn.execute("RELEASE unit_of_work")
+		else:
+			conn.commit()
+	finally:
+		_POOL.in_unit_of_work = False
+		_POOL.inserted = []
+
+
+@contextmanager
+def read_transaction() -> Iterator[sqlite3.Connection]:
+	"""Yield the pooled connection with a read snapshot held for the block.
+
+	Plain SELECTs never open a transaction implicitly, so each would read its
+	own snapshot. This issues a deferred ``BEGIN`` so the enclosed reads agree,
+	unless a transaction is already open, in which case they share that one.
+	Unlike ``unit_of_work`` nothing is reset or cleared on error.
+	"""
+	with get_connection() as conn:
+		if not conn.in_transaction:
+			conn.execute("BEGIN")
+		yield conn
+
+
+def record_insert(obj: Any) -> None:
+	"""Note that ``obj.id`` was just assigned by an INSERT.
+
+	Inside ``unit_of_work`` the id is reset to ``None`` if the unit rolls back;
+	outside a unit the INSERT is committed immediately and nothing is recorded.
+	"""
+	if in_unit_of_work():
+		_POOL.inserted.append(obj)
+
+
+def close_pool() -> None:
+	"""Close the calling thread's pooled connection, if one is open.
+
+	The next ``get_connection`` call opens a fresh connection. Tests call this
+	before removing ``DB_FILE``.
+	"""
+	conn = getattr(_POOL, "conn", None)
+	if conn is not None:
+		conn.close()
+		_POOL.conn = None
+	_POOL.in_unit_of_work = False
+	_POOL.inserted = []
+
+
+# Identity map of hydrated objects keyed by ``(class, id)``, evicting the least
+# recently used entry once ``IDENTITY_MAX_SIZE`` is exceeded. It is shared by
+# all threads, so a ``save()`` in one thread invalidates the entry for every
+# thread; ``_IDENTITY_LOCK`` guards each read-modify-write.
+IDENTITY_MAX_SIZE = 4096
+_IDENTITY: "OrderedDict[Tuple[type, int], Any]" = OrderedDict()
+_IDENTITY_LOCK = threading.Lock()
+
+
+def identity_get(cls: type, id_: int) -> Optional[Any]:
+	"""Return the cached ``cls`` instance with ``id_``, or ``None``."""
+	with _IDENTITY_LOCK:
+		obj = _IDENTITY.get((cls, id_))
+		if obj is not None:
+			_IDENTITY.move_to_end((cls, id_))
+		return obj
+
+
+def identity_put(cls: type, id_: int, obj: Any) -> None:
+	"""Cache ``obj`` as the ``cls`` instance with ``id_``."""
+	with _IDENTITY_LOCK:
+		_IDENTITY[(cls, id_)] = obj
+		_IDENTITY.move_to_end((cls, id_))
+		if len(_IDENTITY) > IDENTITY_MAX_SIZE:
+			_IDENTITY.popitem(last=False)
+
+
+def identity_discard(cls: type, id_: int) -> None:
+	"""Drop the cached ``cls`` instance with ``id_``, if any."""
+	with _IDENTITY_LOCK:
+		_IDENTITY.pop((cls, id_), None)
+
+
+def identity_clear() -> None:
+	"""Drop every cached instance.
+
+	Called when a unit of work rolls back, since rows loaded inside it may not
+	match the database any more. Tests call this between runs.
+	"""
+	with _IDENTITY_LOCK:
+		_IDENTITY.clear()
+
+
+def tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+	"""Return a cursor on ``conn`` that yields plain tuples.
+
+	Scalar and single-row lookups index rows positionally, so they skip the
+	``sqlite3.Row`` construction; ``sqlite3.Row`` is kept for hydration by name.
+	"""
+	cur = conn.cursor()
+	cur.row_factory = None
+	return cur
+
+
+def chunked(values: Iterable, size: int = MAX_VARIABLES) -> Iterator[List]:
+	"""Yield ``values`` as lists of at most ``size`` items.
+
+	Used to split ``IN (?, ...)`` parameter lists so that each statement stays
+	within SQLite's bound parameter limit.
+	"""
+	chunk: List = []
+	for value in values:
+		chunk.append(value)
+		if len(chunk) == size:
+			yield chunk
+			chunk = []
+	if chunk:
+		yield chunk
+
+
+def fetch_batches(
+	sql: str,
+	params: Iterable = (),
+	*,
+	tuples: bool = False,
+	stream: bool = True,
+	size: int = FETCH_SIZE,
+) -> Iterator[List]:
+	"""Run ``sql`` and yield its rows in lists of at most ``size`` rows.
+
+	Streams large result sets instead of materializing them with ``fetchall``.
+	Rows are ``sqlite3.Row`` objects, or plain tuples when ``tuples`` is true.
+
+	An open SELECT pins its connection's read snapshot (and, outside WAL mode,
+	holds a SHARED lock) until it finishes. With ``stream`` true the query
+	therefore runs on a dedicated connection that is closed when the iterator
+	is exhausted or closed, so a partly consumed iterator does not change what
+	other queries on the pooled connection see. Inside a transaction on the
+	pooled connection, such as ``unit_of_work``, the pooled connection is used
+	so the rows include the transaction's own writes; its snapshot is already
+	fixed by that transaction. Callers that consume every row straight away
+	pass ``stream=False`` to reuse the pooled connection. Rows are fetched
+	outside ``get_connection``, so abandoning the iterator never commits or
+	rolls back anything.
+	"""
+	conn = _pooled_connection()
+	owned = None
+	if stream and not (in_unit_of_work() or conn.in_transaction) and DB_FILE != ":memory:":
+		conn = owned = _open_connection()
+	try:
+		cur = tuple_cursor(conn) if tuples else conn.cursor()
+		cur.execute(sql, params)
+		while True:
+			batch = cur.fetchmany(size)
+			if not batch:
+				return
+			yield batch
+	finally:
+		if owned is not None:
+			owned.close()
+
+
+# Tables and indexes created by ``create_tables``.
+_SCHEMA_OBJECTS = (
+	"authors",
+	"magazines",
+	"articles",
+	"idx_articles_author_id",
+	"idx_articles_magazine_id",
+	"idx_articles_mag_auth",
+)
+
+
 def create_tables() -> None:
 	"""Create the ``authors``, ``magazines``, and ``articles`` tables.
 
+	Indexes on ``articles.author_id`` and ``articles.magazine_id`` are
+	created alongside the tables.
+
 	The operation is idempotent and enables foreign key enforcement for the
-	active connection.
+	active connection. When every table and index already exists the DDL is
+	skipped; otherwise it runs in a single ``BEGIN IMMEDIATE`` transaction.
 	"""
 	with get_connection() as conn:
 		cur = conn.cursor()
@@ -38,6 +320,20 @@ def create_tables() -> None:
 		# Enable foreign key enforcement for this connection.
 		cur.execute("PRAGMA foreign_keys = ON;")
 
+		# Fast path: the schema is already in place.
+		placeholders = ", ".join("?" * len(_SCHEMA_OBJECTS))
+		row = cur.execute(
+			f"SELECT count(*) FROM sqlite_master WHERE name IN ({placeholders})",
+			_SCHEMA_OBJECTS,
+		).fetchone()
+		if row[0] == len(_SCHEMA_OBJECTS):
+			return
+
+		# Run the DDL as one transaction instead of one autocommit per statement;
+		# leaving ``get_connection`` commits it.
+		if not conn.in_transaction:
+			cur.execute("BEGIN IMMEDIATE;")
+
 		# Create base tables.
 		cur.execute(
 			"""
@@ -73,7 +369,16 @@ def create_tables() -> None:
 			"""
 		)
 
-		conn.commit()
+		# Index the foreign keys used by the relationship and aggregate
+		# helpers; the composite index covers GROUP BY author_id per magazine.
+		cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_author_id ON articles(author_id);")
+		cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_magazine_id ON articles(magazine_id);")
+		cur.execute(
+			"CREATE INDEX IF NOT EXISTS idx_articles_mag_auth ON articles(magazine_id, author_id);"
+		)
+
+		# Refresh planner statistics so the indexes are considered.
+		cur.execute("ANALYZE;")
 
 
 if __name__ == "__main__":
@@ -1,16 +1,62 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional, TYPE_CHECKING
-
-from .database_utils import get_connection
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+from .database_utils import (
+    chunked,
+    fetch_batches,
+    get_connection,
+    identity_discard,
+    identity_get,
+    identity_put,
+    read_transaction,
+    record_insert,
+    tuple_cursor,
+)
 
 if TYPE_CHECKING:
     from .author import Author
     from .article import Article
 
 
-@dataclass
+_SQL_FIND_BY_ID = "SELECT id, name, category FROM magazines WHERE id = ?"
+_SQL_FIND_BY_IDS = "SELECT id, name, category FROM magazines WHERE id IN ({placeholders})"
+_SQL_INSERT = "INSERT INTO magazines(name, category) VALUES (?, ?)"
+_SQL_UPDATE = "UPDATE magazines SET name = ?, category = ? WHERE id = ?"
+_SQL_ARTICLES = """
+    SELECT a.id, a.title, a.content, a.author_id, au.name
+    FROM articles a
+    JOIN authors au ON au.id = a.author_id
+    WHERE a.magazine_id = ?
+    ORDER BY a.id
+"""
+# Semijoin: reads author ids from the covering idx_articles_mag_auth without
+# sorting joined rows for DISTINCT.
+_SQL_CONTRIBUTORS = """
+    SELECT au.id, au.name
+    FROM authors au
+    WHERE au.id IN (SELECT author_id FROM articles WHERE magazine_id = ?)
+    ORDER BY au.id
+"""
+_SQL_ARTICLE_TITLES = "SELECT title FROM articles WHERE magazine_id = ? ORDER BY id"
+_SQL_CONTRIBUTING_AUTHORS = """
+    SELECT author_id
+    FROM articles
+    WHERE magazine_id = ?
+    GROUP BY author_id
+    HAVING COUNT(id) > 2
+"""
+_SQL_TOP_PUBLISHER = """
+    SELECT magazine_id, COUNT(id) AS c
+    FROM articles
+    GROUP BY magazine_id
+    ORDER BY c DESC
+    LIMIT 1
+"""
+
+
+@dataclass(slots=True)
 class Magazine:
     id: Optional[int]
     _name: str
@@ -52,104 +98,138 @@ class Magazine:
     def new_from_db(cls, row) -> "Magazine":
         if row is None:
             return None
-        if isinstance(row, (list, tuple)):
-            id_, name, category = row
-        else:
-            id_, name, category = row["id"], row["name"], row["category"]
-        return cls(name=name, category=category, id=id_)
+        # Tuples and ``sqlite3.Row`` both unpack positionally.
+        id_, name, category = row
+        # Reuse the instance already loaded for this id, if any.
+        obj = identity_get(cls, id_)
+        if obj is None:
+            obj = cls._from_db_fast(id_, name, category)
+            identity_put(cls, id_, obj)
+        return obj
+
+    @classmethod
+    def _from_db_fast(cls, id_: int, name: str, category: Optional[str]) -> "Magazine":
+        obj = object.__new__(cls)
+        obj._name = name
+        obj._category = category
+        obj.id = id_
+        return obj
 
     @classmethod
     def find_by_id(cls, id_: int) -> Optional["Magazine"]:
+        cached = identity_get(cls, id_)
+        if cached is not None:
+            return cached
         with get_connection() as conn:
-            row = conn.execute("SELECT id, name, category FROM magazines WHERE id = ?", (id_,)).fetchone()
+            row = tuple_cursor(conn).execute(_SQL_FIND_BY_ID, (id_,)).fetchone()
             return cls.new_from_db(row)
 
+    @classmethod
+    def find_by_ids(cls, ids: Iterable[int]) -> Dict[int, "Magazine"]:
+        # Load many magazines at once, keyed by id; missing ids are omitted.
+        found: Dict[int, Magazine] = {}
+        missing = []
+        for id_ in set(ids):
+            cached = identity_get(cls, id_)
+            if cached is not None:
+                found[id_] = cached
+            else:
+                missing.append(id_)
+        with get_connection() as conn:
+            for chunk in chunked(missing):
+                placeholders = ", ".join("?" * len(chunk))
+                rows = conn.execute(
+                    _SQL_FIND_BY_IDS.format(placeholders=placeholders),
+                    chunk,
+                ).fetchall()
+                for r in rows:
+                    found[r["id"]] = cls.new_from_db(r)
+        return found
+
     def save(self) -> "Magazine":
         with get_connection() as conn:
-            cur = conn.cursor()
             if self.id is None:
-                cur.execute(
-                    "INSERT INTO magazines(name, category) VALUES (?, ?)",
-                    (self._name, self._category),
-                )
-                self.id = cur.lastrowid
+                self.id = conn.execute(_SQL_INSERT, (self._name, self._category)).lastrowid
+                record_insert(self)
             else:
-                cur.execute(
-                    "UPDATE magazines SET name = ?, category = ? WHERE id = ?",
-                    (self._name, self._category, self.id),
-                )
-            conn.commit()
+                conn.execute(_SQL_UPDATE, (self._name, self._category, self.id))
+                identity_discard(type(self), self.id)
         return self
 
     # Relationship helpers.
     def articles(self) -> List["Article"]:
+        return list(self._iter_articles(stream=False))
+
+    def iter_articles(self) -> Iterator["Article"]:
+        # Stream articles in batches rather than materializing every row first;
+        # see ``fetch_batches`` for which connection the rows are read from.
+        return self._iter_articles(stream=True)
+
+    def _iter_articles(self, stream: bool) -> Iterator["Article"]:
         from .article import Article
+        from .author import Author
         if self.id is None:
-            return []
-        with get_connection() as conn:
-            rows = conn.execute(
-                "SELECT id, title, content, author_id, magazine_id FROM articles WHERE magazine_id = ?",
-                (self.id,),
-            ).fetchall()
-            return [Article.new_from_db(r) for r in rows]
+            return
+        # Author columns come back with each row, so no per-row queries are needed;
+        # an author is only built when the identity map does not already hold it.
+        for rows in fetch_batches(_SQL_ARTICLES, (self.id,), stream=stream):
+            for id_, title, content, author_id, name in rows:
+                author = identity_get(Author, author_id)
+                if author is None:
+                    author = Author._from_db_fast(author_id, name)
+                    identity_put(Author, author_id, author)
+                yield Article._from_db_fast(id_, title, content, author, self)
 
     def contributors(self) -> List["Author"]:
         from .author import Author
         if self.id is None:
             return []
         with get_connection() as conn:
-            rows = conn.execute(
-                """
-                SELECT DISTINCT au.id, au.name
-                FROM authors au
-                JOIN articles a ON a.author_id = au.id
-                WHERE a.magazine_id = ?
-                """,
-                (self.id,),
-            ).fetchall()
+            rows = conn.execute(_SQL_CONTRIBUTORS, (self.id,)).fetchall()
             return [Author.new_from_db(r) for r in rows]
 
     # Aggregate helpers.
     def article_titles(self) -> List[str]:
+        return list(self._iter_article_titles(stream=False))
+
+    def iter_article_titles(self) -> Iterator[str]:
+        return self._iter_article_titles(stream=True)
+
+    def _iter_article_titles(self, stream: bool) -> Iterator[str]:
         if self.id is None:
-            return []
-        with get_connection() as conn:
-            rows = conn.execute(
-                "SELECT title FROM articles WHERE magazine_id = ? ORDER BY id",
-                (self.id,),
-            ).fetchall()
-            return [r["title"] if not isinstance(r, (list, tuple)) else r[0] for r in rows]
+            return
+        for rows in fetch_batches(_SQL_ARTICLE_TITLES, (self.id,), tuples=True, stream=stream):
+            yield from (r[0] for r in rows)
 
     @classmethod
     def contributing_authors(cls, magazine_id: int) -> List[int]:
         # Return author IDs with more than two articles in the given magazine.
         with get_connection() as conn:
-            rows = conn.execute(
-                """
-                SELECT author_id
-                FROM articles
-                WHERE magazine_id = ?
-                GROUP BY author_id
-                HAVING COUNT(id) > 2
-                """,
-                (magazine_id,),
-            ).fetchall()
-            # rows of single column
-            return [r[0] if isinstance(r, (list, tuple)) else r["author_id"] for r in rows]
+            # Iterate the cursor directly; rows have a single column.
+            return [r[0] for r in tuple_cursor(conn).execute(_SQL_CONTRIBUTING_AUTHORS, (magazine_id,))]
+
+    def summary(self) -> Dict[str, Any]:
+        # Titles, contributors and contributing author IDs read from one snapshot.
+        from .author import Author
+        if self.id is None:
+            return {"titles": [], "contributors": [], "contributing_author_ids": []}
+        with read_transaction() as conn:
+            titles = [r[0] for r in tuple_cursor(conn).execute(_SQL_ARTICLE_TITLES, (self.id,))]
+            contributors = [Author.new_from_db(r) for r in conn.execute(_SQL_CONTRIBUTORS, (self.id,))]
+            contributing = [
+                r[0] for r in tuple_cursor(conn).execute(_SQL_CONTRIBUTING_AUTHORS, (self.id,))
+            ]
+        return {
+            "titles": titles,
+            "contributors": contributors,
+            "contributing_author_ids": contributing,
+        }
 
     @classmethod
     def top_publisher(cls) -> Optional[int]:
         # Return the magazine_id with the most articles, or ``None`` if no data exists.
         with get_connection() as conn:
-            row = conn.execute(
-                """
-                SELECT magazine_id, COUNT(id) AS c
-                FROM articles
-                GROUP BY magazine_id
-                ORDER BY c DESC
-                LIMIT 1
-                """
-            ).fetchone()
+            row = tuple_cursor(conn).execute(_SQL_TOP_PUBLISHER).fetchone()
             if not row:
                 return None
-            return row[0] if isinstance(row, (list, tuple)) else row["magazine_id"]
+            return row[0]
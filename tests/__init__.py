@@ -11,35 +11,58 @@ Note: We keep the tests in __init__.py per request. pytest.ini adjusts discovery
 
 from __future__ import annotations
 
-import os
 import sqlite3
+import threading
 import typing as t
 
 import pytest
 
-from lib.database_utils import create_tables, DB_FILE, get_connection
+import lib.database_utils as database_utils
+from lib.database_utils import close_pool, create_tables, get_connection, identity_clear, unit_of_work
 from lib.author import Author
 from lib.magazine import Magazine
 from lib.article import Article
 
 
+# Run against a shared in-memory database instead of magazine.db. An in-memory
+# database is discarded when its last connection closes, so keep one open.
+TEST_DB_URI = "file::memory:?cache=shared"
+database_utils.DB_FILE = TEST_DB_URI
+_keepalive = sqlite3.connect(TEST_DB_URI, uri=True)
+
+
 @pytest.fixture(autouse=True)
 def fresh_db():
     """Ensure a clean database for each test.
 
-    - Remove the DB file if it exists.
+    - Clear the identity map of objects loaded by earlier tests.
+    - Drop the tables left by the previous test.
     - Recreate tables with foreign keys enabled.
     """
-    if os.path.exists(DB_FILE):
-        os.remove(DB_FILE)
+    identity_clear()
+    with get_connection() as conn:
+        for table in ("articles", "magazines", "authors"):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
     create_tables()
     yield
 
 
 def _table_names() -> t.List[str]:
     with get_connection() as conn:
-        rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
-        return sorted([row[0] if isinstance(row, (list, tuple)) else row["name"] for row in rows])
+        return sorted(row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'"))
+
+
+def _trace_create_tables() -> t.List[str]:
+    # Run create_tables and return the SQL it sent on the pooled connection.
+    statements: t.List[str] = []
+    with get_connection() as conn:
+        conn.set_trace_callback(statements.append)
+    try:
+        create_tables()
+    finally:
+        with get_connection() as conn:
+            conn.set_trace_callback(None)
+    return statements
 
 
 def test_create_tables_and_foreign_keys():
@@ -49,6 +72,33 @@ def test_create_tables_and_foreign_keys():
     assert "magazines" in names
     assert "articles" in names
 
+    with get_connection() as conn:
+        indexes = {
+            row["name"]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        }
+    assert {"idx_articles_author_id", "idx_articles_magazine_id", "idx_articles_mag_auth"} <= indexes
+
+    # a second call finds the schema in place and runs no DDL
+    statements = _trace_create_tables()
+    assert statements
+    assert not [
+        sql for sql in statements
+        if sql.lstrip().upper().startswith(("CREATE", "BEGIN IMMEDIATE", "ANALYZE"))
+    ]
+    assert _table_names() == names
+
+    # a database from before the indexes existed gets them on the next call
+    with get_connection() as conn:
+        conn.execute("DROP INDEX idx_articles_mag_auth")
+    statements = _trace_create_tables()
+    assert any("idx_articles_mag_auth" in sql for sql in statements)
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type='index' AND name='idx_articles_mag_auth'"
+        ).fetchone()
+    assert row[0] == 1
+
     # foreign keys pragma is per-connection; ensure we can enable and insert valid refs
     with get_connection() as conn:
         conn.execute("PRAGMA foreign_keys = ON;")
@@ -79,6 +129,12 @@ def test_author_crud_and_relationships():
     assert [a.title for a in au.articles()] == ["AI Trends"]
     assert [m.name for m in au.magazines()] == ["Tech Today"]
 
+    # topic areas are distinct and sorted, skipping magazines without a category
+    Article("Lab Notes", author=au, magazine=Magazine("Science Daily", "Science").save()).save()
+    Article("Misc", author=au, magazine=Magazine("Gazette").save()).save()
+    Article("AI Trends II", author=au, magazine=mg).save()
+    assert au.topic_areas() == ["Science", "Technology"]
+
 
 def test_magazine_crud_relationships_and_titles():
     au = Author("Alice").save()
@@ -133,3 +189,256 @@ def test_aggregates_contributing_authors_and_top_publisher():
 
     # top publisher: mg1 has 4 articles vs mg2 has 1
     assert Magazine.top_publisher() == mg1.id
+
+    # summary combines titles, contributors and contributing authors
+    summary = mg1.summary()
+    assert summary["titles"] == ["A1", "A2", "A3", "B1"]
+    assert sorted(a.name for a in summary["contributors"]) == ["Alice", "Bob"]
+    assert summary["contributing_author_ids"] == [au1.id]
+
+    # summary joins a transaction that is already open instead of starting one
+    with get_connection() as conn:
+        conn.execute("INSERT INTO articles(title, author_id, magazine_id) VALUES ('B2', ?, ?)", (au2.id, mg1.id))
+        assert mg1.summary()["titles"] == ["A1", "A2", "A3", "B1", "B2"]
+        assert conn.in_transaction
+
+
+def test_get_connection_reuses_pooled_connection():
+    with get_connection() as first:
+        pass
+    with get_connection() as second:
+        assert second is first
+        # pragmas are applied once when the pooled connection is opened
+        assert second.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    close_pool()
+    with get_connection() as third:
+        assert third is not first
+
+
+def test_find_by_ids_and_bulk_hydrated_articles():
+    au1 = Author("Alice").save()
+    au2 = Author("Bob").save()
+    mg = Magazine("Tech Today", "Technology").save()
+    Article("A1", au1, mg).save()
+    Article("B1", au2, mg).save()
+
+    found = Author.find_by_ids([au1.id, au2.id, 999])
+    assert sorted(found) == [au1.id, au2.id]
+    assert found[au2.id].name == "Bob"
+    assert [m.name for m in Magazine.find_by_ids([mg.id]).values()] == ["Tech Today"]
+
+    articles = mg.articles()
+    assert [(a.title, a.author.name) for a in articles] == [("A1", "Alice"), ("B1", "Bob")]
+    assert all(a.magazine is mg for a in articles)
+
+
+def test_find_by_id_uses_identity_map():
+    mg = Magazine("Tech Today", "Technology").save()
+    first = Magazine.find_by_id(mg.id)
+    assert Magazine.find_by_id(mg.id) is first
+
+    # saving an update invalidates the cached instance
+    mg.category = "Tech"
+    mg.save()
+    reloaded = Magazine.find_by_id(mg.id)
+    assert reloaded is not first
+    assert reloaded.category == "Tech"
+
+    # loading the same row again through another path keeps the cached instance
+    au = Author("Alice").save()
+    Article("A1", au, mg).save()
+    assert Magazine.new_from_db((mg.id, "Tech Today", "Tech")) is reloaded
+    assert [m for m in au.magazines()][0] is reloaded
+    assert au.articles()[0].magazine is reloaded
+    assert Magazine.find_by_id(mg.id) is reloaded
+
+
+def test_identity_map_is_shared_across_threads():
+    mg = Magazine("Tech Today", "Old").save()
+    assert Magazine.find_by_id(mg.id).category == "Old"
+
+    def update():
+        # a separate instance, so only the database carries the new value
+        Magazine("Tech Today", "New", id=mg.id).save()
+        close_pool()
+
+    worker = threading.Thread(target=update)
+    worker.start()
+    worker.join()
+    assert Magazine.find_by_id(mg.id).category == "New"
+
+
+def test_identity_map_is_cleared_when_a_unit_of_work_rolls_back():
+    mg = Magazine("Tech Today", "Technology").save()
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            mg.category = "Rolled back"
+            mg.save()
+            assert Magazine.find_by_id(mg.id).category == "Rolled back"
+            raise RuntimeError("boom")
+    assert Magazine.find_by_id(mg.id).category == "Technology"
+
+
+def test_unit_of_work_commits_once_and_rolls_back_on_error():
+    au = Author("Alice").save()
+    mg = Magazine("Tech Today", "Technology").save()
+    with unit_of_work():
+        Article("A1", au, mg).save()
+        Article("A2", au, mg).save()
+    assert mg.article_titles() == ["A1", "A2"]
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            Article("A3", au, mg).save()
+            raise RuntimeError("boom")
+    assert mg.article_titles() == ["A1", "A2"]
+
+
+def test_unit_of_work_joins_an_open_transaction():
+    au = Author("Alice").save()
+    mg = Magazine("Tech Today", "Technology").save()
+    with get_connection() as conn:
+        conn.execute("INSERT INTO authors(name) VALUES ('Zed')")
+        au.add_article(mg, "Inside")
+        assert conn.in_transaction
+
+    # both the caller's pending INSERT and the article are committed together
+    with get_connection() as conn:
+        assert conn.execute("SELECT count(*) FROM authors WHERE name = 'Zed'").fetchone()[0] == 1
+    assert mg.article_titles() == ["Inside"]
+
+    # a failing unit inside the open transaction undoes only its own writes
+    with get_connection() as conn:
+        conn.execute("INSERT INTO authors(name) VALUES ('Yan')")
+        with pytest.raises(RuntimeError):
+            with unit_of_work():
+                art = au.add_article(mg, "Undone")
+                raise RuntimeError("boom")
+        assert art.id is None
+    with get_connection() as conn:
+        assert conn.execute("SELECT count(*) FROM authors WHERE name = 'Yan'").fetchone()[0] == 1
+    assert mg.article_titles() == ["Inside"]
+
+
+def test_unit_of_work_rollback_resets_ids_of_unsaved_parents():
+    au = Author("Alice")
+    mg = Magazine("Tech Today", "Technology")
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            au.add_article(mg, "A")
+            raise RuntimeError("boom")
+    assert au.id is None
+    assert mg.id is None
+
+    # the parents can be saved again after the rollback
+    art = Article("B", au, mg).save()
+    assert Author.find_by_id(au.id).name == "Alice"
+    assert [a.title for a in au.articles()] == ["B"]
+    assert art.magazine.id == mg.id
+
+
+def test_iter_articles_streams_across_batches():
+    au = Author("Alice").save()
+    mg = Magazine("Tech Today", "Technology").save()
+    titles = [f"A{i}" for i in range(300)]
+    with unit_of_work():
+        for title in titles:
+            Article(title, au, mg).save()
+
+    assert [a.title for a in au.iter_articles()] == titles
+    assert [a.title for a in mg.articles()] == titles
+    assert list(mg.iter_article_titles()) == titles
+
+
+def test_closing_an_iterator_inside_a_unit_of_work_keeps_its_writes():
+    au = Author("Alice").save()
+    mg = Magazine("Tech Today", "Technology").save()
+    Article("A1", au, mg).save()
+    Article("A2", au, mg).save()
+
+    it = au.iter_articles()
+    next(it)
+    with unit_of_work():
+        carol = Author("Carol").save()
+        it.close()
+    with get_connection() as conn:
+        assert conn.execute("SELECT name FROM authors WHERE id = ?", (carol.id,)).fetchone()[0] == "Carol"
+
+
+def test_partly_consumed_iterator_does_not_pin_the_pooled_snapshot(tmp_path, monkeypatch):
+    # Snapshot isolation between connections needs a WAL file database; the
+    # shared in-memory test database locks tables instead.
+    close_pool()
+    monkeypatch.setattr(database_utils, "DB_FILE", str(tmp_path / "stream.db"))
+    try:
+        create_tables()
+        au = Author("Alice").save()
+        mg = Magazine("Tech Today", "Technology").save()
+        Article.bulk_save([Article(f"A{i}", au, mg) for i in range(300)])
+
+        it = au.iter_articles()
+        next(it)
+
+        def write():
+            Article("Late", Author("Bob").save(), Magazine.find_by_id(mg.id)).save()
+            close_pool()
+
+        worker = threading.Thread(target=write)
+        worker.start()
+        worker.join()
+
+        # the pooled connection sees the new row while the iterator is still open
+        assert len(mg.article_titles()) == 301
+        # the iterator keeps reading its own snapshot
+        assert len(list(it)) == 299
+    finally:
+        close_pool()
+
+
+def test_models_use_slots():
+    au = Author("Alice")
+    mg = Magazine("Tech Today", "Technology")
+    art = Article("AI Trends", au, mg)
+    for obj in (au, mg, art):
+        assert not hasattr(obj, "__dict__")
+    with pytest.raises(AttributeError):
+        art.subtitle = "nope"
+
+
+def test_article_bulk_save_assigns_ids_and_updates():
+    au = Author("Alice").save()
+    mg = Magazine("Tech Today", "Technology").save()
+    Article("Existing", au, mg).save()
+
+    # new parents are saved as part of the batch
+    saved = Article.bulk_save(
+        [Article("A1", au, mg), Article("A2", au, mg), Article("B1", Author("Bob"), mg)]
+    )
+    assert [Article.find_by_id(a.id).title for a in saved] == ["A1", "A2", "B1"]
+    assert saved[2].author.id is not None
+
+    saved[0].content = "v2"
+    Article.bulk_save(saved[:1])
+    assert Article.find_by_id(saved[0].id).content == "v2"
+    assert mg.article_titles() == ["Existing", "A1", "A2", "B1"]
+
+    # the same unsaved article listed twice is inserted once
+    dup = Article("C1", au, mg)
+    Article.bulk_save([dup, dup])
+    assert mg.article_titles() == ["Existing", "A1", "A2", "B1", "C1"]
+
+
+def test_article_bulk_save_rollback_resets_ids():
+    au = Author("Alice")
+    mg = Magazine("Tech Today", "Technology")
+    articles = [Article("A1", au, mg), Article("A2", au, mg)]
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            Article.bulk_save(articles)
+            raise RuntimeError("boom")
+    assert au.id is None and mg.id is None
+    assert [a.id for a in articles] == [None, None]
+
+    Article.bulk_save(articles)
+    assert [a.title for a in au.articles()] == ["A1", "A2"]